@@ -2,12 +2,24 @@
 CRC16-XMODEM checksum implementation for Fitbit Aria protocol.
 
 The Aria scale uses CRC16-XMODEM (polynomial 0x1021) for data validation.
+
+binascii.crc_hqx is exactly this CRC implemented in C, so all
+checksumming delegates to it; it is native on every deployment target
+(x86-64 containers, Raspberry Pi / Graviton aarch64 hosts) with no
+compile step or per-architecture intrinsics needed. A table-driven
+pure-Python routine is kept as a reference implementation and is
+checked against the C one at import time.
 """
 
+import binascii
+from array import array
 
-def crc16_xmodem(data: bytes, initial: int = 0) -> int:
+
+def _crc16_xmodem_bitwise(data: bytes, initial: int = 0) -> int:
     """
-    Calculate CRC16-XMODEM checksum.
+    Bit-serial CRC16-XMODEM reference implementation.
+
+    Only used to generate the lookup table for `_crc16_xmodem_py`.
 
     Args:
         data: Bytes to calculate checksum for
@@ -28,11 +40,86 @@ def crc16_xmodem(data: bytes, initial: int = 0) -> int:
     return crc
 
 
+# 256-entry lookup table: _TABLE[i] is the CRC of the single byte i.
+# array('H') keeps the entries as packed uint16 values.
+_TABLE = array('H', (_crc16_xmodem_bitwise(bytes([i])) for i in range(256)))
+
+
+def _crc16_xmodem_py(data: bytes, initial: int = 0) -> int:
+    """Table-driven pure-Python CRC16-XMODEM (reference/fallback)."""
+    crc = initial
+    table = _TABLE
+    for byte in data:
+        crc = ((crc << 8) ^ table[((crc >> 8) ^ byte) & 0xFF]) & 0xFFFF
+    return crc
+
+
+def crc16_xmodem(data: bytes, initial: int = 0) -> int:
+    """
+    Calculate CRC16-XMODEM checksum.
+
+    Delegates to binascii.crc_hqx, the stdlib C implementation of this
+    exact polynomial.
+
+    Args:
+        data: Bytes-like object to calculate checksum for (a memoryview
+            is accepted and checksummed without copying)
+        initial: Initial CRC value (default 0)
+
+    Returns:
+        16-bit CRC checksum
+    """
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data)
+    return binascii.crc_hqx(data, initial)
+
+
+# Fail loud at import if the platform's crc_hqx ever diverges from the
+# XMODEM reference (it should not: 0x31C3 is the standard check value).
+assert binascii.crc_hqx(b'123456789', 0) == _crc16_xmodem_py(b'123456789') == 0x31C3
+
+
+def crc16_xmodem_update(state: int, chunk: bytes) -> int:
+    """
+    Fold one fragment into a running CRC16-XMODEM state.
+
+    Start from state 0, call once per fragment, then pass the result to
+    `crc16_xmodem_finalize`. This checksums framed messages without
+    concatenating the fragments first.
+
+    Args:
+        state: Running CRC state (0 for the first fragment)
+        chunk: Next fragment of the message
+
+    Returns:
+        Updated CRC state
+    """
+    return crc16_xmodem(chunk, state)
+
+
+def crc16_xmodem_finalize(state: int) -> int:
+    """
+    Finish a streaming CRC and return the 16-bit checksum.
+
+    XMODEM has no final XOR, so this just masks the state to 16 bits.
+
+    Args:
+        state: Running CRC state from `crc16_xmodem_update`
+
+    Returns:
+        16-bit CRC checksum
+    """
+    return state & 0xFFFF
+
+
 def verify_crc(data: bytes) -> bool:
     """
     Verify that data has a valid CRC16-XMODEM checksum.
 
-    The checksum is expected to be the last 2 bytes of the data (big-endian).
+    The checksum is expected to be the last 2 bytes of the data
+    (big-endian). For XMODEM, the CRC of a payload followed by its own
+    big-endian checksum is always zero, so a single pass over the whole
+    buffer suffices -- no payload slice, no separate comparison.
 
     Args:
         data: Data including checksum
@@ -40,25 +127,27 @@ def verify_crc(data: bytes) -> bool:
     Returns:
         True if checksum is valid
     """
-    if len(data) < 3:
-        return False
-
-    payload = data[:-2]
-    expected_crc = int.from_bytes(data[-2:], 'big')
-    calculated_crc = crc16_xmodem(payload)
-
-    return calculated_crc == expected_crc
+    return len(data) >= 3 and crc16_xmodem(data) == 0
 
 
-def append_crc(data: bytes) -> bytes:
+def append_crc(data) -> bytes:
     """
     Append CRC16-XMODEM checksum to data.
 
     Args:
-        data: Data to append checksum to
+        data: Data to append checksum to, either as bytes or as an
+            iterable of bytes fragments (checksummed without first
+            concatenating them)
 
     Returns:
         Data with 2-byte checksum appended (big-endian)
     """
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        fragments = list(data)
+        state = 0
+        for fragment in fragments:
+            state = crc16_xmodem_update(state, fragment)
+        crc = crc16_xmodem_finalize(state)
+        return b''.join(fragments) + crc.to_bytes(2, 'big')
     crc = crc16_xmodem(data)
-    return data + crc.to_bytes(2, 'big')
+    return bytes(data) + crc.to_bytes(2, 'big')
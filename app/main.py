@@ -13,18 +13,21 @@ Security Note:
     Deploy behind a reverse proxy with auth, or on a trusted network only.
 """
 
+import base64
 import logging
 import os
 import re
+import time
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import FastAPI, Request, Depends, Query, Response, HTTPException
-from fastapi.responses import PlainTextResponse, JSONResponse
+import orjson
+from fastapi import BackgroundTasks, FastAPI, Request, Depends, Query, Response, HTTPException
+from fastapi.responses import ORJSONResponse, PlainTextResponse, JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from sqlalchemy import text as sql_text
-from .database import init_db, get_db, Scale, Measurement, User, RawUpload
+from sqlalchemy import delete as sql_delete, func, insert as sql_insert, select as sql_select, text as sql_text, tuple_
+from .database import init_db, get_db, upsert_scale, SessionLocal, Scale, Measurement, User, RawUpload
 from .protocol import (
     parse_upload_request,
     build_upload_response,
@@ -43,14 +46,64 @@ logger = logging.getLogger(__name__)
 # Security: Maximum request body size (1MB should be plenty for scale data)
 MAX_UPLOAD_SIZE = 1 * 1024 * 1024  # 1MB
 
-# Regex for validating MAC address serial numbers (12 hex chars)
+# Regex for validating MAC address serial numbers (12 hex chars).
+# validate_serial_number uses bytes.fromhex instead; kept for reference
+# and as a test oracle.
 MAC_SERIAL_PATTERN = re.compile(r'^[0-9A-Fa-f]{12}$')
 
+# Weight unit shown on the scale display, resolved once at import
+# (WEIGHT_UNIT is set in the container environment and never changes
+# during the process lifetime)
+_UNIT_MAP = {
+    "kg": WeightUnit.KILOGRAMS,
+    "lbs": WeightUnit.POUNDS,
+    "stones": WeightUnit.STONES,
+}
+WEIGHT_UNIT = _UNIT_MAP.get(
+    os.environ.get("WEIGHT_UNIT", "kg").lower(), WeightUnit.KILOGRAMS
+)
+
+# How much of the raw exchange to keep for uploads that parse cleanly:
+#   all    - full request/response blobs (default, matches old behavior)
+#   errors - metadata-only record; blobs are the bulk of the DB growth
+#   none   - no record at all for successful uploads
+# Failed parses always store the full request so they can be replayed.
+KEEP_RAW_UPLOADS = os.environ.get("KEEP_RAW_UPLOADS", "all").lower()
+
+# Constant responses, built once and reused; Starlette renders the body
+# and headers at construction so the same instance can serve every
+# request.
+_T_RESPONSE = PlainTextResponse("T")
+_OK_RESPONSE = PlainTextResponse("OK")
+
+# Measurement INSERT statement, built once; executed with a list of row
+# dicts it becomes a single executemany
+_MEASUREMENT_INSERT = sql_insert(Measurement)
+
+# Cache for the full success response, keyed on (users version, second):
+# the frame only changes when a user is added/removed or the embedded
+# timestamp ticks, so back-to-back uploads reuse the exact same bytes
+# without re-serializing the profiles.
+_upload_response_cache = {"key": None, "data": b""}
+
+# Mutation counters backing the ETags on /api/users and /api/scales.
+# Dashboards polling those endpoints get an immediate 304 -- no query,
+# no serialization -- whenever the collection hasn't changed.
+_etag_versions = {"users": 0, "scales": 0}
+
+# In-process cache of user profiles sent to the scale. Users change
+# rarely, so this saves a full-table SELECT per upload. Invalidated by
+# the user CRUD endpoints; the TTL covers out-of-band edits.
+USER_CACHE_TTL = 60.0
+_user_profiles_cache = {"profiles": None, "ts": 0.0}
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Aria Scale API",
     description="Self-hosted Fitbit Aria Scale API for capturing weight data",
     version="1.0.0",
+    # orjson serializes the list endpoints' dicts at C speed
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -60,6 +113,13 @@ async def startup_event():
     logger.info("Initializing database...")
     init_db()
     logger.info("Database initialized")
+    # Warm the profile cache so the first upload after boot skips the
+    # users SELECT too
+    db = SessionLocal()
+    try:
+        get_user_profiles(db)
+    finally:
+        db.close()
 
 
 def validate_serial_number(serial: str) -> str:
@@ -76,7 +136,13 @@ def validate_serial_number(serial: str) -> str:
         HTTPException: If serial number is invalid
     """
     serial = serial.strip().upper()
-    if not MAC_SERIAL_PATTERN.match(serial):
+    # Equivalent to MAC_SERIAL_PATTERN but without regex/Match overhead.
+    # bytes.fromhex ignores interior spaces, hence the explicit check.
+    try:
+        valid = len(serial) == 12 and ' ' not in serial and len(bytes.fromhex(serial)) == 6
+    except ValueError:
+        valid = False
+    if not valid:
         logger.warning(f"Invalid serial number format: {serial[:20]}")
         raise HTTPException(
             status_code=400,
@@ -85,9 +151,52 @@ def validate_serial_number(serial: str) -> str:
     return serial
 
 
+def get_user_profiles(db: Session) -> list[UserProfile]:
+    """
+    Get user profiles for scale responses, cached for USER_CACHE_TTL.
+
+    Args:
+        db: Database session
+
+    Returns:
+        List of UserProfile objects for all users
+    """
+    cache = _user_profiles_cache
+    if cache["profiles"] is not None and time.monotonic() - cache["ts"] < USER_CACHE_TTL:
+        return cache["profiles"]
+
+    users = db.query(User).all()
+    profiles = [
+        UserProfile(
+            user_id=u.scale_user_id,
+            name=u.name,
+            min_weight_grams=u.min_weight_grams,
+            max_weight_grams=u.max_weight_grams,
+            age=u.age,
+            gender=u.gender,
+            height_mm=u.height_mm,
+        )
+        for u in users
+    ]
+    cache["profiles"] = profiles
+    cache["ts"] = time.monotonic()
+    return profiles
+
+
+def invalidate_user_profiles_cache():
+    """Drop the cached user profiles after a user is created or deleted."""
+    _user_profiles_cache["profiles"] = None
+    _etag_versions["users"] += 1
+
+
+# Bound format method for serial_to_mac; unpacking the 12 chars into one
+# format call avoids the generator, slice temporaries, and str.join.
+_MAC_FMT = '{}{}:{}{}:{}{}:{}{}:{}{}:{}{}'.format
+
+
 def serial_to_mac(serial: str) -> str:
     """Convert 12-char hex serial to MAC address format (AA:BB:CC:DD:EE:FF)."""
-    return ':'.join(serial[i:i+2] for i in range(0, 12, 2))
+    return _MAC_FMT(*serial)
 
 
 def safe_timestamp_parse(ts: int) -> Optional[datetime]:
@@ -102,33 +211,95 @@ def safe_timestamp_parse(ts: int) -> Optional[datetime]:
     """
     # Sanity check: timestamp should be between 2000 and 2100
     if ts < 946684800 or ts > 4102444800:
-        logger.warning(f"Invalid timestamp value: {ts}")
+        logger.warning("Invalid timestamp value: %s", ts)
         return None
     try:
         return datetime.fromtimestamp(ts, tz=timezone.utc)
     except (ValueError, OSError, OverflowError) as e:
-        logger.warning(f"Failed to parse timestamp {ts}: {e}")
+        logger.warning("Failed to parse timestamp %s: %s", ts, e)
         return None
 
 
+def persist_raw_upload(raw_data: bytes, upload, response_data: bytes):
+    """
+    Write the raw request/response exchange for a successful upload.
+
+    Runs as a background task after the response has been sent, so the
+    scale never waits on this BLOB insert. Uses its own short-lived
+    session because the request's session is closed by then.
+
+    Args:
+        raw_data: Raw request bytes from the scale
+        upload: Parsed UploadRequest
+        response_data: Binary response returned to the scale
+    """
+    keep_blobs = KEEP_RAW_UPLOADS == "all"
+    db = SessionLocal()
+    try:
+        db.add(RawUpload(
+            request_data=raw_data if keep_blobs else None,
+            scale_mac=upload.mac_address_str,
+            protocol_version=upload.protocol_version,
+            firmware_version=upload.firmware_version,
+            battery_percent=upload.battery_percent,
+            scale_timestamp=upload.scale_timestamp,
+            measurement_count=len(upload.measurements),
+            response_data=response_data if keep_blobs else None,
+            parsed_ok=True,
+        ))
+        db.commit()
+    except Exception as e:
+        logger.error("Failed to persist raw upload: %s", e)
+        db.rollback()
+    finally:
+        db.close()
+
+
+def encode_cursor(dt: datetime, row_id: int) -> str:
+    """Encode a (timestamp, id) keyset position as an opaque cursor."""
+    raw = f"{dt.timestamp()}:{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a pagination cursor back to its (timestamp, id) position.
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        ts_part, id_part = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return datetime.fromtimestamp(float(ts_part), tz=timezone.utc), int(id_part)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
 # =============================================================================
 # Scale API Endpoints
 # =============================================================================
 
-@app.get("/scale/validate")
-async def scale_validate():
+async def scale_validate(request: Request):
     """
     Scale validation endpoint.
 
     The scale calls this to verify the server is responding.
     Must return "T" for the scale to proceed.
+
+    Polled before every session, so it is mounted as a bare Starlette
+    route: no dependency resolution, no response model, just the
+    prebuilt "T" response.
     """
-    logger.info("Scale validation request received")
-    return PlainTextResponse("T")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Scale validation request received")
+    return _T_RESPONSE
+
+
+app.add_route("/scale/validate", scale_validate, methods=["GET"])
 
 
 @app.get("/scale/register")
-async def scale_register(
+def scale_register(
     serialNumber: str = Query(..., description="Scale MAC address as hex"),
     token: str = Query(..., max_length=64, description="Authorization token"),
     ssid: str = Query("", max_length=64, description="WiFi SSID"),
@@ -146,33 +317,31 @@ async def scale_register(
 
     logger.info(f"Scale registration: serial={serial}, ssid={ssid}")
 
-    # Check if scale already exists
-    scale = db.query(Scale).filter(Scale.serial_number == serial).first()
-
-    if scale:
-        # Update existing scale
-        scale.ssid = ssid[:64] if ssid else None
-        scale.auth_token = token[:64] if token else None
-        scale.last_seen = datetime.now(timezone.utc)
-        logger.info(f"Updated existing scale: {mac_address}")
-    else:
-        # Create new scale
-        scale = Scale(
-            mac_address=mac_address,
-            serial_number=serial,
-            ssid=ssid[:64] if ssid else None,
-            auth_token=token[:64] if token else None,
-        )
-        db.add(scale)
-        logger.info(f"Registered new scale: {mac_address}")
-
+    # Insert or update the scale in a single statement
+    update_values = {
+        "ssid": ssid[:64] if ssid else None,
+        "auth_token": token[:64] if token else None,
+        "last_seen": datetime.now(timezone.utc),
+    }
+    upsert_scale(
+        db,
+        values={
+            "mac_address": mac_address,
+            "serial_number": serial,
+            **update_values,
+        },
+        update_values=update_values,
+    )
     db.commit()
-    return PlainTextResponse("OK")
+    _etag_versions["scales"] += 1
+    logger.info(f"Registered scale: {mac_address}")
+    return _OK_RESPONSE
 
 
 @app.post("/scale/upload")
 async def scale_upload(
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
     """
@@ -186,134 +355,127 @@ async def scale_upload(
     if content_length:
         try:
             if int(content_length) > MAX_UPLOAD_SIZE:
-                logger.warning(f"Upload too large: {content_length} bytes")
+                logger.warning("Upload too large: %s bytes", content_length)
                 raise HTTPException(status_code=413, detail="Request too large")
         except ValueError:
             pass  # Invalid content-length header, let it through
 
-    # Get raw binary data with size limit
-    raw_data = await request.body()
-    if len(raw_data) > MAX_UPLOAD_SIZE:
-        logger.warning(f"Upload body too large: {len(raw_data)} bytes")
-        raise HTTPException(status_code=413, detail="Request too large")
+    # Stream the body so oversize payloads are rejected as soon as the
+    # running total passes the cap, without buffering the full request
+    buf = bytearray()
+    async for chunk in request.stream():
+        buf += chunk
+        if len(buf) > MAX_UPLOAD_SIZE:
+            logger.warning("Upload body too large: >%d bytes", len(buf))
+            raise HTTPException(status_code=413, detail="Request too large")
+    raw_data = bytes(buf)
 
-    logger.info(f"Received upload: {len(raw_data)} bytes")
-
-    # Store raw data for debugging
-    raw_upload = RawUpload(request_data=raw_data)
-    db.add(raw_upload)
+    logger.info("Received upload: %d bytes", len(raw_data))
 
     try:
         # Parse the upload request
         upload = parse_upload_request(raw_data)
 
         logger.info(
-            f"Parsed upload from {upload.mac_address_str}: "
-            f"protocol={upload.protocol_version}, "
-            f"firmware={upload.firmware_version}, "
-            f"battery={upload.battery_percent}%, "
-            f"measurements={len(upload.measurements)}"
+            "Parsed upload from %s: protocol=%s, firmware=%s, "
+            "battery=%s%%, measurements=%d",
+            upload.mac_address_str,
+            upload.protocol_version,
+            upload.firmware_version,
+            upload.battery_percent,
+            len(upload.measurements),
         )
 
-        # Update raw upload with parsed metadata
-        raw_upload.scale_mac = upload.mac_address_str
-        raw_upload.protocol_version = upload.protocol_version
-        raw_upload.firmware_version = upload.firmware_version
-        raw_upload.battery_percent = upload.battery_percent
-        raw_upload.scale_timestamp = upload.scale_timestamp
-        raw_upload.measurement_count = len(upload.measurements)
-
-        # Update scale record
-        scale = db.query(Scale).filter(
-            Scale.mac_address == upload.mac_address_str
-        ).first()
-
-        if scale:
-            scale.firmware_version = upload.firmware_version
-            scale.protocol_version = upload.protocol_version
-            scale.battery_percent = upload.battery_percent
-            scale.auth_code = upload.auth_code.hex() if upload.auth_code else None
-            scale.last_seen = datetime.now(timezone.utc)
-        else:
-            # Auto-register unknown scale
-            scale = Scale(
-                mac_address=upload.mac_address_str,
-                serial_number=upload.serial_number,
-                firmware_version=upload.firmware_version,
-                protocol_version=upload.protocol_version,
-                battery_percent=upload.battery_percent,
-                auth_code=upload.auth_code.hex() if upload.auth_code else None,
-            )
-            db.add(scale)
-            logger.info(f"Auto-registered scale: {upload.mac_address_str}")
+        # One timestamp for the whole batch: shared by the scale's
+        # last_seen, every received_at, and invalid-timestamp fallbacks
+        batch_now = datetime.now(timezone.utc)
+
+        # Insert or update the scale record in a single statement
+        # (auto-registers unknown scales)
+        update_values = {
+            "firmware_version": upload.firmware_version,
+            "protocol_version": upload.protocol_version,
+            "battery_percent": upload.battery_percent,
+            "auth_code": upload.auth_code.hex() if upload.auth_code else None,
+            "last_seen": batch_now,
+        }
+        upsert_scale(
+            db,
+            values={
+                "mac_address": upload.mac_address_str,
+                "serial_number": upload.serial_number,
+                **update_values,
+            },
+            update_values=update_values,
+        )
 
-        # Store each measurement
+        # Store all measurements in a single multi-row INSERT
+        rows = []
         for meas in upload.measurements:
             # Safely parse timestamp
             meas_time = safe_timestamp_parse(meas.timestamp)
             if meas_time is None:
-                meas_time = datetime.now(timezone.utc)
-                logger.warning(f"Using current time for invalid measurement timestamp")
-
-            measurement = Measurement(
-                scale_mac=upload.mac_address_str,
-                measurement_id=meas.measurement_id,
-                timestamp=meas_time,
-                timestamp_raw=meas.timestamp,
-                weight_grams=meas.weight_grams,
-                weight_kg=meas.weight_kg,
-                weight_lbs=meas.weight_lbs,
-                impedance=meas.impedance,
-                body_fat_percent=meas.body_fat_percent,
-                fat_percent_raw_1=meas.fat_percent_1,
-                fat_percent_raw_2=meas.fat_percent_2,
-                covariance=meas.covariance,
-                user_id=meas.user_id,
-                is_guest=meas.is_guest,
-            )
-            db.add(measurement)
-
-            logger.info(
-                f"  Measurement: {meas.weight_kg:.2f}kg, "
-                f"impedance={meas.impedance}, "
-                f"fat={meas.body_fat_percent or 'N/A'}%, "
-                f"user={meas.user_id}, "
-                f"time={meas_time}"
-            )
-
-        raw_upload.parsed_ok = True
-
-        # Build response with user profiles if any
-        users = db.query(User).all()
-        user_profiles = [
-            UserProfile(
-                user_id=u.scale_user_id,
-                name=u.name,
-                min_weight_grams=u.min_weight_grams,
-                max_weight_grams=u.max_weight_grams,
-                age=u.age,
-                gender=u.gender,
-                height_mm=u.height_mm,
+                meas_time = batch_now
+                logger.warning("Using current time for invalid measurement timestamp")
+
+            rows.append({
+                "scale_mac": upload.mac_address_str,
+                "measurement_id": meas.measurement_id,
+                "timestamp": meas_time,
+                "timestamp_raw": meas.timestamp,
+                "received_at": batch_now,
+                "weight_grams": meas.weight_grams,
+                "weight_kg": meas.weight_kg,
+                "weight_lbs": meas.weight_lbs,
+                "impedance": meas.impedance,
+                "body_fat_percent": meas.body_fat_percent,
+                "fat_percent_raw_1": meas.fat_percent_1,
+                "fat_percent_raw_2": meas.fat_percent_2,
+                "covariance": meas.covariance,
+                "user_id": meas.user_id,
+                "is_guest": meas.is_guest,
+            })
+
+        if rows:
+            db.execute(_MEASUREMENT_INSERT, rows)
+            # One debug record for the whole batch: a single handler
+            # acquisition and I/O write instead of one per measurement
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Measurements: %s",
+                    "; ".join(
+                        f"{m.weight_kg:.2f}kg u{m.user_id}"
+                        f" fat={m.body_fat_percent or 'N/A'}%"
+                        for m in upload.measurements
+                    ),
+                )
+
+        # Build response with user profiles if any, reusing the frame
+        # built for an earlier upload in the same second when users
+        # haven't changed
+        cache_key = (_etag_versions["users"], int(time.time()))
+        if _upload_response_cache["key"] == cache_key:
+            response_data = _upload_response_cache["data"]
+        else:
+            response_data = build_upload_response(
+                unit=WEIGHT_UNIT,
+                status=0,
+                users=get_user_profiles(db),
             )
-            for u in users
-        ]
-
-        # Get weight unit preference from environment
-        unit_str = os.environ.get("WEIGHT_UNIT", "kg").lower()
-        unit = {
-            "kg": WeightUnit.KILOGRAMS,
-            "lbs": WeightUnit.POUNDS,
-            "stones": WeightUnit.STONES,
-        }.get(unit_str, WeightUnit.KILOGRAMS)
-
-        response_data = build_upload_response(
-            unit=unit,
-            status=0,
-            users=user_profiles,
-        )
+            _upload_response_cache["key"] = cache_key
+            _upload_response_cache["data"] = response_data
 
-        raw_upload.response_data = response_data
         db.commit()
+        _etag_versions["scales"] += 1
+
+        # The raw exchange is only debug data; persist it after the
+        # response goes out so the scale doesn't wait on the BLOB insert.
+        # (The error path below keeps its write synchronous — failed
+        # uploads must be durably captured.)
+        if KEEP_RAW_UPLOADS != "none":
+            background_tasks.add_task(
+                persist_raw_upload, raw_data, upload, response_data
+            )
 
         return Response(
             content=response_data,
@@ -323,15 +485,19 @@ async def scale_upload(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing upload: {e}", exc_info=True)
-        raw_upload.error_message = str(e)[:512]
+        logger.error("Error processing upload: %s", e, exc_info=True)
+        db.rollback()
+        db.add(RawUpload(
+            request_data=raw_data,
+            error_message=str(e)[:512],
+        ))
         db.commit()
 
         # Return a simple response even on error
         # This prevents the scale from retrying endlessly
-        response_data = build_simple_response()
+        # (build_simple_response caches its frame per second)
         return Response(
-            content=response_data,
+            content=build_simple_response(),
             media_type="application/octet-stream",
         )
 
@@ -351,42 +517,40 @@ async def scale_setup(
     Called during initial WiFi configuration.
     """
     logger.info(f"Scale setup request: ssid={ssid}")
-    return PlainTextResponse("OK")
-
-
-@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
-async def catch_all(request: Request, path: str):
-    """
-    Catch-all endpoint for unhandled routes.
-
-    Logs the request for debugging and returns OK.
-    """
-    # Don't read unlimited body for catch-all
-    body_preview = b""
-    try:
-        body = await request.body()
-        body_preview = body[:100]  # Only log first 100 bytes
-    except Exception:
-        pass
-
-    logger.warning(
-        f"Unhandled request: {request.method} /{path} "
-        f"(body preview: {len(body_preview)} bytes)"
-    )
-    return PlainTextResponse("OK")
+    return _OK_RESPONSE
 
 
 # =============================================================================
 # Management API
 # Note: These endpoints are unauthenticated. Deploy behind a reverse proxy
 # with authentication, or ensure this is only accessible on a trusted network.
+#
+# Handlers that touch the database are plain `def`: FastAPI runs them in
+# its threadpool, so their blocking SQLAlchemy calls don't stall the
+# event loop under concurrent uploads.
 # =============================================================================
 
 @app.get("/api/scales")
-async def list_scales(db: Session = Depends(get_db)):
+def list_scales(request: Request, db: Session = Depends(get_db)):
     """List all registered scales."""
-    scales = db.query(Scale).all()
-    return [
+    etag = f'"{_etag_versions["scales"]}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+
+    # Column-only select: Row tuples skip ORM instance construction
+    scales = db.query(
+        Scale.id,
+        Scale.mac_address,
+        Scale.serial_number,
+        Scale.ssid,
+        Scale.firmware_version,
+        Scale.protocol_version,
+        Scale.battery_percent,
+        Scale.last_seen,
+        Scale.registered_at,
+        Scale.is_active,
+    ).all()
+    data = [
         {
             "id": s.id,
             "mac_address": s.mac_address,
@@ -395,62 +559,110 @@ async def list_scales(db: Session = Depends(get_db)):
             "firmware_version": s.firmware_version,
             "protocol_version": s.protocol_version,
             "battery_percent": s.battery_percent,
-            "last_seen": s.last_seen.isoformat() if s.last_seen else None,
-            "registered_at": s.registered_at.isoformat() if s.registered_at else None,
+            "last_seen": s.last_seen,
+            "registered_at": s.registered_at,
             "is_active": s.is_active,
         }
         for s in scales
     ]
+    return ORJSONResponse(
+        data, headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
 
 
 @app.get("/api/measurements")
-async def list_measurements(
+def list_measurements(
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, deprecated=True, description="Deprecated; use cursor"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page"),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     scale_mac: Optional[str] = Query(None, description="Filter by scale MAC"),
     db: Session = Depends(get_db),
 ):
-    """List measurements with pagination and optional filtering."""
-    query = db.query(Measurement)
+    """
+    List measurements with keyset pagination and optional filtering.
+
+    Pass the returned next_cursor to fetch the following page; unlike
+    the deprecated offset parameter, cursor pages cost the same no
+    matter how deep they are.
+    """
+    # Column-only select: Row tuples skip ORM instance construction
+    query = db.query(
+        Measurement.id,
+        Measurement.scale_mac,
+        Measurement.measurement_id,
+        Measurement.timestamp,
+        Measurement.timestamp_raw,
+        Measurement.received_at,
+        Measurement.weight_grams,
+        Measurement.weight_kg,
+        Measurement.weight_lbs,
+        Measurement.impedance,
+        Measurement.body_fat_percent,
+        Measurement.fat_percent_raw_1,
+        Measurement.fat_percent_raw_2,
+        Measurement.covariance,
+        Measurement.user_id,
+        Measurement.is_guest,
+    )
 
     if user_id is not None:
         query = query.filter(Measurement.user_id == user_id)
     if scale_mac:
         query = query.filter(Measurement.scale_mac == scale_mac.upper())
 
-    measurements = (
+    if cursor:
+        cur_ts, cur_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Measurement.timestamp, Measurement.id) < (cur_ts, cur_id)
+        )
+    elif offset:
+        # Deprecated fallback: O(offset) scan+discard on the server
+        query = query.offset(offset)
+
+    query = (
         query
-        .order_by(Measurement.timestamp.desc())
-        .offset(offset)
+        .order_by(Measurement.timestamp.desc(), Measurement.id.desc())
         .limit(limit)
-        .all()
     )
-    return [
-        {
-            "id": m.id,
-            "scale_mac": m.scale_mac,
-            "measurement_id": m.measurement_id,
-            "timestamp": m.timestamp.isoformat() if m.timestamp else None,
-            "timestamp_raw": m.timestamp_raw,
-            "received_at": m.received_at.isoformat() if m.received_at else None,
-            "weight_grams": m.weight_grams,
-            "weight_kg": m.weight_kg,
-            "weight_lbs": m.weight_lbs,
-            "impedance": m.impedance,
-            "body_fat_percent": m.body_fat_percent,
-            "fat_percent_raw_1": m.fat_percent_raw_1,
-            "fat_percent_raw_2": m.fat_percent_raw_2,
-            "covariance": m.covariance,
-            "user_id": m.user_id,
-            "is_guest": m.is_guest,
-        }
-        for m in measurements
-    ]
+
+    def stream():
+        # Fetch in chunks and serialize row by row: peak memory stays
+        # O(chunk) instead of O(limit), and the first bytes hit the wire
+        # before the last row is even fetched.
+        yield b'{"data":['
+        count = 0
+        last = None
+        for m in query.yield_per(200):
+            row = orjson.dumps({
+                "id": m.id,
+                "scale_mac": m.scale_mac,
+                "measurement_id": m.measurement_id,
+                "timestamp": m.timestamp,
+                "timestamp_raw": m.timestamp_raw,
+                "received_at": m.received_at,
+                "weight_grams": m.weight_grams,
+                "weight_kg": m.weight_kg,
+                "weight_lbs": m.weight_lbs,
+                "impedance": m.impedance,
+                "body_fat_percent": m.body_fat_percent,
+                "fat_percent_raw_1": m.fat_percent_raw_1,
+                "fat_percent_raw_2": m.fat_percent_raw_2,
+                "covariance": m.covariance,
+                "user_id": m.user_id,
+                "is_guest": m.is_guest,
+            })
+            yield row if count == 0 else b"," + row
+            count += 1
+            last = m
+        next_cursor = encode_cursor(last.timestamp, last.id) if count == limit else None
+        yield b'],"next_cursor":' + orjson.dumps(next_cursor) + b"}"
+
+    return StreamingResponse(stream(), media_type="application/json")
 
 
 @app.get("/api/measurements/latest")
-async def latest_measurement(
+def latest_measurement(
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     db: Session = Depends(get_db),
 ):
@@ -468,9 +680,9 @@ async def latest_measurement(
         "id": measurement.id,
         "scale_mac": measurement.scale_mac,
         "measurement_id": measurement.measurement_id,
-        "timestamp": measurement.timestamp.isoformat() if measurement.timestamp else None,
+        "timestamp": measurement.timestamp,
         "timestamp_raw": measurement.timestamp_raw,
-        "received_at": measurement.received_at.isoformat() if measurement.received_at else None,
+        "received_at": measurement.received_at,
         "weight_grams": measurement.weight_grams,
         "weight_kg": measurement.weight_kg,
         "weight_lbs": measurement.weight_lbs,
@@ -485,7 +697,7 @@ async def latest_measurement(
 
 
 @app.post("/api/users")
-async def create_user(
+def create_user(
     name: str = Query(..., min_length=1, max_length=20),
     height_cm: int = Query(..., ge=50, le=250),
     age: int = Query(..., ge=1, le=150),
@@ -502,34 +714,55 @@ async def create_user(
             detail="min_weight_kg must be less than max_weight_kg"
         )
 
-    # Get next user ID
-    max_user = db.query(User).order_by(User.scale_user_id.desc()).first()
-    next_id = (max_user.scale_user_id + 1) if max_user else 1
-
-    user = User(
-        name=name[:20],
-        scale_user_id=next_id,
-        height_mm=height_cm * 10,
-        age=age,
-        gender=gender,
-        min_weight_grams=int(min_weight_kg * 1000),
-        max_weight_grams=int(max_weight_kg * 1000),
-    )
-    db.add(user)
+    # Assign the next scale user ID inside the INSERT itself: the
+    # MAX()+1 is evaluated atomically with the write, so no racy
+    # SELECT-then-INSERT and no full ORM row hydration
+    next_id = sql_select(
+        func.coalesce(func.max(User.scale_user_id), 0) + 1
+    ).scalar_subquery()
+    row = db.execute(
+        sql_insert(User)
+        .values(
+            name=name[:20],
+            scale_user_id=next_id,
+            height_mm=height_cm * 10,
+            age=age,
+            gender=gender,
+            min_weight_grams=int(min_weight_kg * 1000),
+            max_weight_grams=int(max_weight_kg * 1000),
+        )
+        .returning(User.id, User.scale_user_id)
+    ).one()
     db.commit()
+    invalidate_user_profiles_cache()
 
     return {
-        "id": user.id,
-        "scale_user_id": user.scale_user_id,
-        "name": user.name,
+        "id": row.id,
+        "scale_user_id": row.scale_user_id,
+        "name": name[:20],
     }
 
 
 @app.get("/api/users")
-async def list_users(db: Session = Depends(get_db)):
+def list_users(request: Request, db: Session = Depends(get_db)):
     """List all user profiles."""
-    users = db.query(User).all()
-    return [
+    etag = f'"{_etag_versions["users"]}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304)
+
+    # Column-only select: Row tuples skip ORM instance construction
+    users = db.query(
+        User.id,
+        User.scale_user_id,
+        User.name,
+        User.height_mm,
+        User.age,
+        User.gender,
+        User.min_weight_grams,
+        User.max_weight_grams,
+        User.created_at,
+    ).all()
+    data = [
         {
             "id": u.id,
             "scale_user_id": u.scale_user_id,
@@ -539,65 +772,111 @@ async def list_users(db: Session = Depends(get_db)):
             "gender": "male" if u.gender == 0 else "female",
             "min_weight_kg": u.min_weight_grams / 1000,
             "max_weight_kg": u.max_weight_grams / 1000,
-            "created_at": u.created_at.isoformat() if u.created_at else None,
+            "created_at": u.created_at,
         }
         for u in users
     ]
+    return ORJSONResponse(
+        data, headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
 
 
 @app.delete("/api/users/{user_id}")
-async def delete_user(user_id: int, db: Session = Depends(get_db)):
+def delete_user(user_id: int, db: Session = Depends(get_db)):
     """Delete a user profile."""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    # Single DELETE; rowcount answers the existence question without a
+    # prior SELECT or ORM entity load
+    result = db.execute(sql_delete(User).where(User.id == user_id))
+    db.commit()
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="User not found")
 
-    db.delete(user)
-    db.commit()
+    invalidate_user_profiles_cache()
     return {"status": "deleted", "id": user_id}
 
 
 @app.get("/api/raw-uploads")
-async def list_raw_uploads(
+def list_raw_uploads(
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, deprecated=True, description="Deprecated; use cursor"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page"),
     errors_only: bool = Query(False, description="Only show failed uploads"),
     db: Session = Depends(get_db),
 ):
-    """List raw upload records for debugging."""
-    query = db.query(RawUpload)
+    """List raw upload records for debugging, with keyset pagination."""
+    # Column-only select; the blobs themselves stay in the database and
+    # only their lengths travel over the wire
+    query = db.query(
+        RawUpload.id,
+        RawUpload.received_at,
+        RawUpload.scale_mac,
+        RawUpload.protocol_version,
+        RawUpload.firmware_version,
+        RawUpload.battery_percent,
+        RawUpload.scale_timestamp,
+        RawUpload.measurement_count,
+        func.length(RawUpload.request_data).label("request_size"),
+        func.length(RawUpload.response_data).label("response_size"),
+        RawUpload.parsed_ok,
+        RawUpload.error_message,
+    )
     if errors_only:
         query = query.filter(RawUpload.parsed_ok == False)
 
+    if cursor:
+        cur_ts, cur_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(RawUpload.received_at, RawUpload.id) < (cur_ts, cur_id)
+        )
+    elif offset:
+        # Deprecated fallback: O(offset) scan+discard on the server
+        query = query.offset(offset)
+
     uploads = (
         query
-        .order_by(RawUpload.received_at.desc())
-        .offset(offset)
+        .order_by(RawUpload.received_at.desc(), RawUpload.id.desc())
         .limit(limit)
         .all()
     )
-    return [
+
+    next_cursor = None
+    if len(uploads) == limit:
+        last = uploads[-1]
+        next_cursor = encode_cursor(last.received_at, last.id)
+
+    data = [
         {
             "id": u.id,
-            "received_at": u.received_at.isoformat() if u.received_at else None,
+            "received_at": u.received_at,
             "scale_mac": u.scale_mac,
             "protocol_version": u.protocol_version,
             "firmware_version": u.firmware_version,
             "battery_percent": u.battery_percent,
             "scale_timestamp": u.scale_timestamp,
             "measurement_count": u.measurement_count,
-            "request_size": len(u.request_data) if u.request_data else 0,
-            "response_size": len(u.response_data) if u.response_data else 0,
+            "request_size": u.request_size or 0,
+            "response_size": u.response_size or 0,
             "parsed_ok": u.parsed_ok,
             "error_message": u.error_message,
         }
         for u in uploads
     ]
+    return {"data": data, "next_cursor": next_cursor}
+
+
+# Liveness probes can hit /api/health many times a second; reuse the
+# last result for up to a second rather than re-running SELECT 1
+_HEALTH_TTL = 1.0
+_health_cache = {"payload": None, "ts": 0.0}
 
 
 @app.get("/api/health")
-async def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_db)):
     """Health check endpoint with database connectivity test."""
+    cache = _health_cache
+    if cache["payload"] is not None and time.monotonic() - cache["ts"] < _HEALTH_TTL:
+        return cache["payload"]
+
     try:
         # Test database connection
         db.execute(sql_text("SELECT 1"))
@@ -605,29 +884,52 @@ async def health_check(db: Session = Depends(get_db)):
     except Exception as e:
         db_status = f"error: {str(e)[:100]}"
 
-    return {
+    payload = {
         "status": "ok" if db_status == "ok" else "degraded",
         "service": "aria-api",
         "database": db_status,
     }
+    cache["payload"] = payload
+    cache["ts"] = time.monotonic()
+    return payload
+
+
+# Root API info never changes at runtime; serialize it once
+_ROOT_RESPONSE = ORJSONResponse({
+    "service": "Fitbit Aria Scale API (Self-Hosted)",
+    "version": "1.0.0",
+    "endpoints": {
+        "scale": ["/scale/validate", "/scale/register", "/scale/upload"],
+        "api": [
+            "/api/scales",
+            "/api/measurements",
+            "/api/measurements/latest",
+            "/api/users",
+            "/api/raw-uploads",
+            "/api/health",
+        ],
+    },
+    "security_note": "Management API is unauthenticated. Deploy on trusted network only.",
+})
 
 
 @app.get("/")
 async def root():
     """Root endpoint with API info."""
-    return {
-        "service": "Fitbit Aria Scale API (Self-Hosted)",
-        "version": "1.0.0",
-        "endpoints": {
-            "scale": ["/scale/validate", "/scale/register", "/scale/upload"],
-            "api": [
-                "/api/scales",
-                "/api/measurements",
-                "/api/measurements/latest",
-                "/api/users",
-                "/api/raw-uploads",
-                "/api/health",
-            ],
-        },
-        "security_note": "Management API is unauthenticated. Deploy on trusted network only.",
-    }
+    return _ROOT_RESPONSE
+
+
+# Registered last: routes match in registration order, so this must come
+# after every real endpoint or it shadows them.
+@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+async def catch_all(request: Request, path: str):
+    """
+    Catch-all endpoint for unhandled routes.
+
+    Logs the request for debugging and returns OK. Only the headers are
+    inspected -- reading the body would buffer arbitrarily large
+    payloads from unknown clients into memory just to log a length.
+    """
+    size = request.headers.get("content-length", "0")
+    logger.warning("Unhandled request: %s /%s (%s bytes)", request.method, path, size)
+    return _OK_RESPONSE
@@ -6,17 +6,38 @@ Based on protocol documentation from:
 - https://github.com/ads04r/aria-spoof
 """
 
+from __future__ import annotations
+
 import logging
 import struct
 import time
 from dataclasses import dataclass
 from enum import IntEnum
+from functools import cached_property
 from typing import Optional
 
-from .crc import crc16_xmodem, verify_crc, append_crc
+from .crc import crc16_xmodem, verify_crc
 
 logger = logging.getLogger(__name__)
 
+# Pre-compiled wire formats (little-endian). struct re-parses a format
+# string on every unpack call; Struct instances parse it once at import
+# and their unpack_from reads straight out of the buffer with no slice.
+_HEADER = struct.Struct('<LL6s16s')   # protocol, battery, MAC, auth code
+_META = struct.Struct('<LLLL')        # firmware, unknown, timestamp, count
+_MEAS = struct.Struct('<LLLLLLLL')    # one 32-byte measurement record
+
+# Response formats, packed into a preallocated buffer
+_RESP_HEADER = struct.Struct('<LLLL')   # timestamp, unit, status, user count
+# One 80-byte user record: id, 16 pad, name, min/max weight, age,
+# gender, 3 pad, height, last weight/fat/time, 2 reserved words. The
+# x specifiers zero the padding, so the whole record is one pack call.
+_USER = struct.Struct('<L16x20sLLLB3xLLLLLL')
+_FW_FLAG = struct.Struct('<L')          # firmware-update-available flag
+_CRC_BE = struct.Struct('>H')           # trailing big-endian checksum
+
+_USER_RECORD_SIZE = _USER.size
+
 
 class WeightUnit(IntEnum):
     """Weight display unit preference."""
@@ -25,7 +46,10 @@ class WeightUnit(IntEnum):
     KILOGRAMS = 2
 
 
-@dataclass
+# slots: no per-instance __dict__, cheaper construction; frozen: records
+# off the wire are never mutated. Field order must stay in wire order --
+# parse_upload_request constructs these positionally.
+@dataclass(slots=True, frozen=True)
 class ScaleMeasurement:
     """Individual weight measurement from the scale."""
     measurement_id: int
@@ -50,10 +74,10 @@ class ScaleMeasurement:
     @property
     def body_fat_percent(self) -> Optional[float]:
         """Average body fat percentage, or None if not available."""
-        if self.fat_percent_1 == 0 and self.fat_percent_2 == 0:
-            return None
-        # Average the two readings and divide by 10 (scale factor)
-        return (self.fat_percent_1 + self.fat_percent_2) / 20.0
+        # Readings are unsigned, so the sum is 0 exactly when both are.
+        # Average the two and undo the x10 scale factor: /20 == *0.05.
+        total = self.fat_percent_1 + self.fat_percent_2
+        return None if total == 0 else total * 0.05
 
     @property
     def is_guest(self) -> bool:
@@ -61,6 +85,8 @@ class ScaleMeasurement:
         return self.user_id == 0
 
 
+# Not slotted: cached_property needs the instance __dict__, and there is
+# exactly one of these per request anyway.
 @dataclass
 class UploadRequest:
     """Parsed upload request from the scale."""
@@ -73,12 +99,15 @@ class UploadRequest:
     measurements: list[ScaleMeasurement]
     raw_data: bytes
 
-    @property
+    # cached_property: the strings are rebuilt on first access only;
+    # the upload handler reads them several times per request
+    @cached_property
     def mac_address_str(self) -> str:
         """MAC address as colon-separated hex string."""
-        return ':'.join(f'{b:02X}' for b in self.mac_address)
+        s = self.serial_number
+        return f'{s[0:2]}:{s[2:4]}:{s[4:6]}:{s[6:8]}:{s[8:10]}:{s[10:12]}'
 
-    @property
+    @cached_property
     def serial_number(self) -> str:
         """Serial number (MAC as hex without separators)."""
         return self.mac_address.hex().upper()
@@ -131,47 +160,26 @@ def parse_upload_request(data: bytes) -> UploadRequest:
         )
 
     # Parse header (30 bytes)
-    header_fmt = '<LL6s16s'
-    header_size = struct.calcsize(header_fmt)
-    protocol_version, battery_percent, mac_address, auth_code = struct.unpack(
-        header_fmt, data[:header_size]
-    )
+    protocol_version, battery_percent, mac_address, auth_code = _HEADER.unpack_from(data)
 
     if protocol_version != 3:
         raise ValueError(f"Unsupported protocol version: {protocol_version}")
 
     # Parse metadata (16 bytes)
-    meta_fmt = '<LLLL'
-    meta_size = struct.calcsize(meta_fmt)
-    meta_start = header_size
-    firmware_version, unknown, scale_timestamp, measurement_count = struct.unpack(
-        meta_fmt, data[meta_start:meta_start + meta_size]
+    meta_start = _HEADER.size
+    firmware_version, unknown, scale_timestamp, measurement_count = _META.unpack_from(
+        data, meta_start
     )
 
-    # Parse measurements (32 bytes each)
-    measurement_fmt = '<LLLLLLLL'
-    measurement_size = struct.calcsize(measurement_fmt)
-    measurements = []
-
-    meas_start = meta_start + meta_size
-    for i in range(measurement_count):
-        offset = meas_start + (i * measurement_size)
-        if offset + measurement_size > len(data) - 2:  # Account for CRC
-            break
-
-        meas_data = struct.unpack(
-            measurement_fmt, data[offset:offset + measurement_size]
-        )
-        measurements.append(ScaleMeasurement(
-            measurement_id=meas_data[0],
-            impedance=meas_data[1],
-            weight_grams=meas_data[2],
-            timestamp=meas_data[3],
-            user_id=meas_data[4],
-            fat_percent_1=meas_data[5],
-            fat_percent_2=meas_data[6],
-            covariance=meas_data[7],
-        ))
+    # Parse measurements (32 bytes each) in one bulk pass: clamp the
+    # count to what actually fits before the CRC, then iter_unpack the
+    # whole block instead of a Python-level offset/slice/unpack loop.
+    # ScaleMeasurement's field order matches the wire order, so the
+    # tuples construct it positionally.
+    meas_start = meta_start + _META.size
+    count = min(measurement_count, (len(data) - 2 - meas_start) // _MEAS.size)
+    block = memoryview(data)[meas_start:meas_start + count * _MEAS.size]
+    measurements = [ScaleMeasurement(*fields) for fields in _MEAS.iter_unpack(block)]
 
     return UploadRequest(
         protocol_version=protocol_version,
@@ -185,7 +193,7 @@ def parse_upload_request(data: bytes) -> UploadRequest:
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class UserProfile:
     """User profile to send to the scale."""
     user_id: int
@@ -200,28 +208,61 @@ class UserProfile:
     last_timestamp: int = 0
 
 
-def build_upload_response(
+def response_size(n_users: int, fw_url_len: int = 0) -> int:
+    """
+    Exact byte length of an upload response frame.
+
+    Args:
+        n_users: Number of user profiles in the response
+        fw_url_len: Encoded length of the firmware URL, 0 if none
+
+    Returns:
+        Total frame size including trailer and CRC
+    """
+    return (
+        _RESP_HEADER.size
+        + _USER_RECORD_SIZE * n_users
+        + _FW_FLAG.size
+        + (fw_url_len + 1 if fw_url_len else 0)
+        + 2  # trailer
+        + 2  # CRC
+    )
+
+
+def build_upload_response_into(
+    buf: bytearray,
+    offset: int = 0,
     unit: WeightUnit = WeightUnit.KILOGRAMS,
     status: int = 0,
     users: Optional[list[UserProfile]] = None,
     firmware_update_available: bool = False,
     firmware_url: str = "",
-) -> bytes:
+) -> int:
     """
-    Build a binary response for the scale upload request.
+    Pack an upload response frame into an existing buffer.
+
+    Split from `build_upload_response` so callers with a steady profile
+    set can reuse one bytearray across responses instead of allocating
+    per call. The target region must be zero-filled (padding bytes and
+    the URL terminator are never written explicitly); `response_size`
+    gives the exact length to reserve.
 
     Response format:
     - timestamp: uint32 (current Unix time)
     - unit: uint32 (0=lbs, 1=stones, 2=kg)
     - status: uint32 (configuration status)
     - user_count: uint32
-    - users: array of user profiles (60 bytes each)
+    - users: array of user profiles (80 bytes each: id, 16 bytes
+      padding, 20 bytes name, weight limits/age/gender, 3 bytes
+      padding, height and last-measurement fields)
     - firmware_update: uint32 (1 if update available)
     - firmware_url: null-terminated string (if update available)
     - trailer: 2 bytes (0x66 0x00 or 0xAC 0x00)
     - CRC16-XMODEM: 2 bytes (big-endian)
 
     Args:
+        buf: Destination buffer, zero-filled over the target region
+        offset: Where in buf the frame starts
         unit: Weight display unit
         status: Configuration status (0 = OK)
         users: List of user profiles to send to scale
@@ -229,40 +270,45 @@ def build_upload_response(
         firmware_url: URL for firmware update
 
     Returns:
-        Binary response data
+        Offset one past the end of the written frame
     """
     users = users or []
 
-    # Build response body
-    response = struct.pack(
-        '<LLLL',
-        int(time.time()),  # Current timestamp
+    url_bytes = (
+        firmware_url.encode('utf-8')
+        if firmware_update_available and firmware_url else b''
+    )
+    start = offset
+    end = offset + response_size(len(users), len(url_bytes))
+
+    _RESP_HEADER.pack_into(
+        buf, offset,
+        # Integer all the way: no float round-trip for the second count
+        time.time_ns() // 1_000_000_000,  # Current timestamp
         int(unit),  # Weight unit
         status,  # Status
         len(users),  # User count
     )
 
     # Add user profiles
+    offset += _RESP_HEADER.size
     for user in users:
-        # User profile format: 60 bytes
-        # '<L16x20sLLLBxxxLLLLLL'
-        name_bytes = user.name.encode('utf-8')[:20].ljust(20, b'\x00')
-        user_data = struct.pack(
-            '<L',
-            user.user_id,
+        name = user.name
+        # ASCII names (the normal case) truncate before encoding and
+        # take CPython's dedicated ascii-encode path; 20s zero-pads
+        # short names either way
+        name_bytes = (
+            name[:20].encode('ascii') if name.isascii()
+            else name.encode('utf-8')[:20]
         )
-        user_data += b'\x00' * 16  # 16 bytes padding
-        user_data += name_bytes  # 20 bytes name
-        user_data += struct.pack(
-            '<LLLB',
+        _USER.pack_into(
+            buf, offset,
+            user.user_id,
+            name_bytes,
             user.min_weight_grams,
             user.max_weight_grams,
             user.age,
             user.gender,
-        )
-        user_data += b'\x00' * 3  # 3 bytes padding
-        user_data += struct.pack(
-            '<LLLLLL',
             user.height_mm,
             user.last_weight_grams,
             user.last_fat_percent,
@@ -270,20 +316,68 @@ def build_upload_response(
             0,  # Reserved
             0,  # Reserved
         )
-        response += user_data
+        offset += _USER_RECORD_SIZE
 
     # Firmware update info
-    response += struct.pack('<L', 1 if firmware_update_available else 0)
-    if firmware_update_available and firmware_url:
-        response += firmware_url.encode('utf-8') + b'\x00'
+    _FW_FLAG.pack_into(buf, offset, 1 if firmware_update_available else 0)
+    offset += _FW_FLAG.size
+    if url_bytes:
+        buf[offset:offset + len(url_bytes)] = url_bytes
+        offset += len(url_bytes) + 1  # keep the terminating NUL (already zero)
+
+    # Trailer bytes (0x66 0x00 indicates success); the second byte and
+    # the CRC's slot are already zero
+    buf[offset] = 0x66
+
+    # CRC over everything before the trailing two bytes
+    _CRC_BE.pack_into(buf, end - 2, crc16_xmodem(memoryview(buf)[start:end - 2]))
+
+    return end
+
+
+def build_upload_response(
+    unit: WeightUnit = WeightUnit.KILOGRAMS,
+    status: int = 0,
+    users: Optional[list[UserProfile]] = None,
+    firmware_update_available: bool = False,
+    firmware_url: str = "",
+) -> bytes:
+    """
+    Build a binary response for the scale upload request.
 
-    # Trailer bytes (0x66 0x00 indicates success)
-    response += bytes([0x66, 0x00])
+    The layout is fully predictable, so the frame is packed into one
+    exact-size bytearray (see `build_upload_response_into`) instead of
+    growing a bytes object by concatenation.
 
-    # Append CRC
-    response = append_crc(response)
+    Args:
+        unit: Weight display unit
+        status: Configuration status (0 = OK)
+        users: List of user profiles to send to scale
+        firmware_update_available: Whether firmware update is available
+        firmware_url: URL for firmware update
+
+    Returns:
+        Binary response data
+    """
+    n_url = (
+        len(firmware_url.encode('utf-8'))
+        if firmware_update_available and firmware_url else 0
+    )
+    buf = bytearray(response_size(len(users or []), n_url))
+    build_upload_response_into(
+        buf,
+        unit=unit,
+        status=status,
+        users=users,
+        firmware_update_available=firmware_update_available,
+        firmware_url=firmware_url,
+    )
+    return bytes(buf)
 
-    return response
+
+# The simple response only varies with the embedded unix second, so the
+# last frame is cached here and reused within the same second.
+_simple_cache = {"second": 0, "data": b""}
 
 
 def build_simple_response() -> bytes:
@@ -291,11 +385,17 @@ def build_simple_response() -> bytes:
     Build a minimal response for the scale.
 
     This is the simplest valid response that tells the scale
-    everything is OK without any user profiles.
+    everything is OK without any user profiles. Cached per second:
+    repeated calls return the previous frame without packing or CRC
+    work until the embedded timestamp ticks.
     """
-    return build_upload_response(
-        unit=WeightUnit.KILOGRAMS,
-        status=0,
-        users=[],
-        firmware_update_available=False,
-    )
+    now = time.time_ns() // 1_000_000_000
+    if _simple_cache["second"] != now:
+        _simple_cache["data"] = build_upload_response(
+            unit=WeightUnit.KILOGRAMS,
+            status=0,
+            users=[],
+            firmware_update_available=False,
+        )
+        _simple_cache["second"] = now
+    return _simple_cache["data"]